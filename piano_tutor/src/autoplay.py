@@ -0,0 +1,259 @@
+# piano_tutor/src/autoplay.py
+import time
+import numpy
+import pygame
+
+# --- Autoplay Constants ---
+AUTOPLAY_BLOCK_SEC = 0.25    # Length of each pre-mixed block handed to the mixer
+AUTOPLAY_NOTE_AMPLITUDE = 0.3  # Per-note peak (fraction of full scale), leaves headroom for chords
+AUTOPLAY_FADE_SEC = 0.005    # Attack/release ramp so note edges do not click
+
+# pygame.mixer sample size (as reported by get_init()) -> (dtype, scale, offset) used to
+# encode mixed float samples in [-1, 1]
+MIXER_SAMPLE_FORMATS = {
+    -8: (numpy.int8, 127, 0),
+    8: (numpy.uint8, 127, 128),
+    -16: (numpy.int16, 32767, 0),
+    16: (numpy.uint16, 32767, 32768),
+    -32: (numpy.float32, 1.0, 0), # pygame 2 reports float32 output as -32
+}
+
+
+def midi_to_frequency(note_midi):
+    """Returns the equal-tempered frequency in Hz of a MIDI note (A4 = 69 = 440 Hz)."""
+    return 440.0 * (2.0 ** ((note_midi - 69) / 12.0))
+
+
+class AutoplayScheduler:
+    """
+    Plays a song's notes by mixing them at exact sample offsets into a stream of
+    fixed-size blocks queued on a reserved mixer channel.
+
+    The frame loop only has to call update() once per frame to keep one block queued
+    behind the one that is playing, so note timing comes from the sample position in
+    the stream rather than from when a frame happened to run. The visual playhead is
+    derived from the same stream via playhead_seconds().
+
+    The playhead is a wall clock that is re-anchored every time a queued block is seen
+    to start, shifted by the mixer's output latency. Between anchors it can drift from
+    the audio by at most the interval between update() calls (one frame), plus
+    whatever latency the audio driver adds beyond the mixer buffer.
+    """
+    def __init__(self, notes_list, channel, sample_rate=44100, num_channels=1,
+                 block_sec=AUTOPLAY_BLOCK_SEC, output_latency_sec=0.0, sample_size=-16):
+        """
+        Initializes an AutoplayScheduler.
+
+        Args:
+            notes_list (list[Note]): The song notes to play; they need not be sorted.
+            channel (pygame.mixer.Channel): Channel used exclusively for the autoplay stream.
+                                            It should be reserved (pygame.mixer.set_reserved)
+                                            so interactive key sounds never steal it.
+            sample_rate (int): Mixer sample rate in Hz.
+            num_channels (int): Mixer output channels (1 = mono, 2 = stereo).
+            block_sec (float): Length of each queued block in seconds. This is also how
+                               late a frame may be before the stream underruns.
+            output_latency_sec (float): Time between the mixer starting a block and it being
+                                        heard, typically the mixer buffer size divided by
+                                        the sample rate.
+            sample_size (int): Mixer sample format as reported by pygame.mixer.get_init()
+                               (-16 = signed 16-bit, 8 = unsigned 8-bit, -32 = float, ...).
+        """
+        if block_sec <= 0:
+            raise ValueError("block_sec must be a positive number.")
+        if sample_size not in MIXER_SAMPLE_FORMATS:
+            raise ValueError(f"Unsupported mixer sample size: {sample_size}.")
+
+        self.notes = sorted(notes_list, key=lambda n: n.start_time)
+        self.channel = channel
+        self.sample_rate = sample_rate
+        self.num_channels = num_channels
+        self.block_samples = max(1, int(round(block_sec * sample_rate)))
+        self.output_latency_sec = max(0.0, output_latency_sec)
+        self.sample_size = sample_size
+
+        self._tone_cache = {}
+        self._is_playing = False
+        self._next_note_index = 0
+        self._sounding_notes = [] # (start_sample, tone_array) of notes overlapping the mix cursor
+        self._mix_cursor_sample = 0 # Song sample where the next block starts
+        self._stream_start_sample = 0
+        self._stream_start_wall = 0.0
+        self._playing_block_end_sample = 0
+        self._queued_block = None # (start_sample, sound) waiting behind the playing block
+        self._playing_sound = None
+        self._last_update_wall = 0.0
+
+    # --- Tone Synthesis ---
+    def _tone_for(self, note_midi, num_samples):
+        cache_key = (note_midi, num_samples)
+        tone = self._tone_cache.get(cache_key)
+        if tone is None:
+            t_vals = numpy.arange(num_samples, dtype=numpy.float32) / self.sample_rate
+            tone = AUTOPLAY_NOTE_AMPLITUDE * numpy.sin(
+                2 * numpy.pi * midi_to_frequency(note_midi) * t_vals
+            ).astype(numpy.float32)
+            fade_samples = min(int(AUTOPLAY_FADE_SEC * self.sample_rate), num_samples // 2)
+            if fade_samples > 0:
+                ramp = numpy.linspace(0.0, 1.0, fade_samples, dtype=numpy.float32)
+                tone[:fade_samples] *= ramp
+                tone[-fade_samples:] *= ramp[::-1]
+            self._tone_cache[cache_key] = tone
+        return tone
+
+    # --- Mixing ---
+    def _mix_next_block(self):
+        block_start = self._mix_cursor_sample
+        block_end = block_start + self.block_samples
+        mix_buffer = numpy.zeros(self.block_samples, dtype=numpy.float32)
+
+        # Admit every note that begins before the end of this block
+        while self._next_note_index < len(self.notes):
+            upcoming_note = self.notes[self._next_note_index]
+            note_start_sample = int(round(upcoming_note.start_time * self.sample_rate))
+            if note_start_sample >= block_end:
+                break
+            note_num_samples = max(1, int(round(upcoming_note.duration * self.sample_rate)))
+            self._sounding_notes.append(
+                (note_start_sample, self._tone_for(upcoming_note.note_midi, note_num_samples))
+            )
+            self._next_note_index += 1
+
+        still_sounding = []
+        for note_start_sample, tone in self._sounding_notes:
+            note_end_sample = note_start_sample + len(tone)
+            overlap_start = max(note_start_sample, block_start)
+            overlap_end = min(note_end_sample, block_end)
+            if overlap_end > overlap_start:
+                mix_buffer[overlap_start - block_start:overlap_end - block_start] += \
+                    tone[overlap_start - note_start_sample:overlap_end - note_start_sample]
+            if note_end_sample > block_end:
+                still_sounding.append((note_start_sample, tone))
+        self._sounding_notes = still_sounding
+
+        self._mix_cursor_sample = block_end
+
+        sample_dtype, sample_scale, sample_offset = MIXER_SAMPLE_FORMATS[self.sample_size]
+        pcm_samples = (numpy.clip(mix_buffer, -1.0, 1.0) * sample_scale + sample_offset).astype(sample_dtype)
+        if self.num_channels > 1:
+            pcm_samples = numpy.repeat(pcm_samples, self.num_channels) # Interleave identical channels
+        return block_start, pygame.mixer.Sound(buffer=pcm_samples.tobytes())
+
+    # --- Transport ---
+    def start(self, start_time_sec=0.0):
+        """
+        Starts (or restarts) the stream from the given song time.
+
+        Args:
+            start_time_sec (float): Song time in seconds at which playback begins. Notes
+                                    already sounding at that time are joined mid-way.
+        """
+        self.stop()
+        start_sample = int(round(max(0.0, start_time_sec) * self.sample_rate))
+        self._mix_cursor_sample = start_sample
+        self._next_note_index = 0
+        self._sounding_notes = []
+        # Skip notes that have fully finished before the start point
+        while self._next_note_index < len(self.notes):
+            past_note = self.notes[self._next_note_index]
+            if past_note.start_time + past_note.duration > start_time_sec:
+                break
+            self._next_note_index += 1
+
+        first_block_start, first_sound = self._mix_next_block()
+        self.channel.play(first_sound)
+        self._playing_sound = first_sound
+        self._stream_start_sample = first_block_start
+        self._stream_start_wall = time.perf_counter() + self.output_latency_sec
+        self._last_update_wall = time.perf_counter()
+        self._playing_block_end_sample = first_block_start + self.block_samples
+        self._queued_block = self._mix_next_block()
+        self.channel.queue(self._queued_block[1])
+        self._is_playing = True
+
+    def stop(self):
+        """Stops the stream; playhead_seconds() keeps returning the last position."""
+        if self._is_playing:
+            self._stream_start_sample = self._current_sample()
+            self._stream_start_wall = time.perf_counter()
+            self.channel.stop()
+        self._is_playing = False
+        self._queued_block = None
+        self._playing_sound = None
+
+    def is_playing(self):
+        return self._is_playing
+
+    def song_end_seconds(self):
+        """Returns the time (in seconds) at which the last note of the song ends."""
+        return max((n.start_time + n.duration for n in self.notes), default=0.0)
+
+    def update(self):
+        """
+        Keeps one block queued behind the playing one. Call once per frame; it does
+        nothing (and costs nothing) until the mixer has taken the queued block.
+        """
+        if not self._is_playing:
+            return
+        now_wall = time.perf_counter()
+        previous_update_wall, self._last_update_wall = self._last_update_wall, now_wall
+        if self.channel.get_queue() is not None:
+            return
+
+        if self._queued_block is not None:
+            # The queued block was taken by the mixer at some point since the previous
+            # update(), and is heard output_latency_sec after that. Clamp the clock into
+            # that window in either direction, so it can neither lag nor lead the audio.
+            promoted_start_sample, self._playing_sound = self._queued_block
+            self._playing_block_end_sample = promoted_start_sample + self.block_samples
+            self._queued_block = None
+            latency_samples = int(self.output_latency_sec * self.sample_rate)
+            earliest_sample = promoted_start_sample - latency_samples
+            latest_sample = earliest_sample + int((now_wall - previous_update_wall) * self.sample_rate)
+            current_sample = self._current_sample()
+            if current_sample < earliest_sample:
+                self._rebase_clock(earliest_sample, now_wall)
+            elif current_sample > latest_sample:
+                self._rebase_clock(latest_sample, now_wall)
+
+        song_is_mixed = self._next_note_index >= len(self.notes) and not self._sounding_notes
+        if not self.channel.get_busy():
+            # Either the song has played out, or a frame stalled longer than a block
+            if song_is_mixed:
+                self.stop()
+            else:
+                self.start(self._mix_cursor_sample / self.sample_rate)
+            return
+        if song_is_mixed:
+            return # Let the last block finish; nothing left to queue
+
+        self._queued_block = self._mix_next_block()
+        self.channel.queue(self._queued_block[1])
+
+    # --- Playhead ---
+    def _rebase_clock(self, anchor_sample, anchor_wall):
+        self._stream_start_sample = anchor_sample
+        self._stream_start_wall = anchor_wall
+
+    def _current_sample(self):
+        if not self._is_playing:
+            return self._stream_start_sample
+        # The anchor starts output_latency_sec in the future, before the first block is heard
+        elapsed_samples = max(0, int((time.perf_counter() - self._stream_start_wall) * self.sample_rate))
+        # The playing block has not finished while a block is still queued behind it
+        current_sample = self._stream_start_sample + elapsed_samples
+        if self._queued_block is not None:
+            current_sample = min(current_sample, self._playing_block_end_sample)
+        return current_sample
+
+    def playhead_seconds(self):
+        """Returns the song time (in seconds) currently being heard."""
+        return self._current_sample() / self.sample_rate
+
+    def sounding_midis(self):
+        """Returns the set of MIDI numbers whose notes are audible at the playhead."""
+        current_t_sec = self.playhead_seconds()
+        return {
+            music_note_obj.note_midi for music_note_obj in self.notes
+            if music_note_obj.start_time <= current_t_sec < music_note_obj.start_time + music_note_obj.duration
+        }
@@ -6,6 +6,8 @@ import os
 import numpy
 import wave
 from note import Note # Assuming note.py is in the same directory (src/)
+from autoplay import AutoplayScheduler
+from particles import ParticlePool
 
 # --- Sound Generation Function ---
 def create_placeholder_sound_file(filepath, frequency=440, duration_sec=0.2, sample_rate=44100):
@@ -47,6 +49,7 @@ def create_placeholder_sound_file(filepath, frequency=440, duration_sec=0.2, sam
 
 # --- Constants ---
 SCREEN_WIDTH, SCREEN_HEIGHT, FPS = 1280, 720, 60
+MIXER_BUFFER_SAMPLES = 512 # Output buffer size; also the autoplay latency compensation
 BLACK = (0,0,0)
 DARK_BLUE = (10,20,40)
 WHITE = (255,255,255)
@@ -66,6 +69,7 @@ KEYBOARD_START_MIDI = 60 # C4 (Middle C)
 NUM_OCTAVES = 3
 NOTE_FALL_SPEED = 150.0 # Pixels per second
 WHITE_KEYS_PER_OCTAVE = 7
+SPARKS_PER_NOTE_HIT, SPARKS_PER_KEY_STRIKE = 60, 30
 NUM_STARS = 150
 stars_data = []
 
@@ -163,9 +167,11 @@ def render_piano_roll(surface, notes_list, current_t_sec, wh_map, bl_map, fall_s
                 note_rect_width *= 0.75
                 note_rect_x += key_rectangle.width * 0.125 # Center it a bit
 
-            # Calculate Y position based on current time and note start time
-            note_top_y_raw = hit_line_y - ((music_note_obj.start_time - current_t_sec) * fall_speed_pps)
+            # Calculate Y position based on current time and note start time. Notes fall
+            # downwards, so the bottom edge reaches hit_line_y at start_time (when the key
+            # lights up and the sparks fire) and the top edge when the note ends.
             note_height_raw = music_note_obj.duration * fall_speed_pps
+            note_top_y_raw = hit_line_y - ((music_note_obj.start_time - current_t_sec) * fall_speed_pps) - note_height_raw
 
             # Clip rendering to the visible piano roll area
             actual_draw_top_y = max(view_area_top_y, note_top_y_raw)
@@ -176,14 +182,33 @@ def render_piano_roll(surface, notes_list, current_t_sec, wh_map, bl_map, fall_s
             if display_height > 0:
                 pygame.draw.rect(surface, CYAN, (note_rect_x, actual_draw_top_y, note_rect_width, display_height))
 
+# --- Particle Effects ---
+def emit_key_sparks(particle_pool, midi_val, wh_map, bl_map, hit_line_y, spark_count, spark_color):
+    key_rectangle, _ = find_key_attributes_for_midi(midi_val, wh_map, bl_map)
+    if key_rectangle:
+        particle_pool.emit(key_rectangle.centerx, hit_line_y, spark_count, spark_color)
+
+def emit_note_hit_sparks(particle_pool, notes_list, previous_t_sec, current_t_sec, wh_map, bl_map, hit_line_y):
+    # A note reaches the action line when the playhead passes its start time
+    for music_note_obj in notes_list:
+        if previous_t_sec < music_note_obj.start_time <= current_t_sec:
+            emit_key_sparks(particle_pool, music_note_obj.note_midi, wh_map, bl_map,
+                            hit_line_y, SPARKS_PER_NOTE_HIT, CYAN)
+
 # --- Main Application Function ---
 def main_application():
+    # Mixer settings must be given before pygame.init(), which starts the mixer itself;
+    # a later pygame.mixer.init() call would be ignored
+    pygame.mixer.pre_init(frequency=44100, size=-16, channels=1, buffer=MIXER_BUFFER_SAMPLES)
     pygame.init()
-    # Explicitly set mixer to avoid issues in some environments, before creating Sound objects
-    try:
-        pygame.mixer.init(frequency=44100, size=-16, channels=1)
-    except pygame.error as mixer_error:
-        print(f"Mixer init error: {mixer_error}. Sound might not work.")
+    if not pygame.mixer.get_init():
+        try:
+            pygame.mixer.init(frequency=44100, size=-16, channels=1, buffer=MIXER_BUFFER_SAMPLES)
+        except pygame.error as mixer_error:
+            print(f"Mixer init error: {mixer_error}. Sound might not work.")
+    # Reserve channel 0 for the autoplay stream so key presses never interrupt it
+    if pygame.mixer.get_init():
+        pygame.mixer.set_reserved(1)
 
     main_screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
     pygame.display.set_caption("Piano Tutor")
@@ -227,6 +252,7 @@ def main_application():
     pc_keys_held_down = set()
     mouse_button_held_midi = None
     playback_time_seconds = 0.0
+    spark_pool = ParticlePool()
 
     # Notes for the piano roll
     sample_notes_sequence = [
@@ -239,11 +265,29 @@ def main_application():
         Note(note_midi=72, start_time=5.0, duration=0.5)  # C5
     ]
 
+    # "Listen first" autoplay, toggled with SPACE and rewound with HOME
+    autoplay_scheduler = None
+    autoplay_has_run = False # Once it has, the playhead only moves while autoplay plays
+    mixer_settings = pygame.mixer.get_init()
+    if mixer_settings:
+        autoplay_scheduler = AutoplayScheduler(
+            sample_notes_sequence, pygame.mixer.Channel(0),
+            sample_rate=mixer_settings[0], num_channels=mixer_settings[2],
+            output_latency_sec=MIXER_BUFFER_SAMPLES / mixer_settings[0],
+            sample_size=mixer_settings[1]
+        )
+
     app_is_running = True
     # --- Main Game Loop ---
     while app_is_running:
         time_step_seconds = master_clock.tick(FPS) / 1000.0
-        playback_time_seconds += time_step_seconds
+        previous_playback_time_seconds = playback_time_seconds
+        if autoplay_scheduler and autoplay_scheduler.is_playing():
+            # Playhead follows the audio stream, not the frame clock
+            autoplay_scheduler.update()
+            playback_time_seconds = autoplay_scheduler.playhead_seconds()
+        elif not autoplay_has_run:
+            playback_time_seconds += time_step_seconds
 
         # --- Event Handling ---
         for evt in pygame.event.get():
@@ -258,6 +302,8 @@ def main_application():
                 for midi_note_val, key_rect_obj in black_keys_map.items():
                     if key_rect_obj.collidepoint(mouse_pos):
                         currently_active_midis.add(midi_note_val)
+                        emit_key_sparks(spark_pool, midi_note_val, white_keys_map, black_keys_map,
+                                        ACTION_LINE_Y, SPARKS_PER_KEY_STRIKE, WHITE)
                         mouse_button_held_midi = midi_note_val
                         if main_placeholder_sound: main_placeholder_sound.play()
                         key_found_by_mouse = True
@@ -266,6 +312,8 @@ def main_application():
                     for midi_note_val, key_rect_obj in white_keys_map.items():
                         if key_rect_obj.collidepoint(mouse_pos):
                             currently_active_midis.add(midi_note_val)
+                            emit_key_sparks(spark_pool, midi_note_val, white_keys_map, black_keys_map,
+                                            ACTION_LINE_Y, SPARKS_PER_KEY_STRIKE, WHITE)
                             mouse_button_held_midi = midi_note_val
                             if main_placeholder_sound: main_placeholder_sound.play()
                             break # Found key
@@ -279,6 +327,23 @@ def main_application():
             # Key Down (PC Keyboard)
             if evt.type == pygame.KEYDOWN:
                 pressed_key_code = evt.key
+                if pressed_key_code == pygame.K_SPACE and autoplay_scheduler:
+                    if autoplay_scheduler.is_playing():
+                        # Pause: the playhead stays where the audio stopped
+                        autoplay_scheduler.stop()
+                        playback_time_seconds = autoplay_scheduler.playhead_seconds()
+                    else:
+                        # Resume from the visible playhead; start over if it was never
+                        # positioned by autoplay or the song has played out
+                        if not autoplay_has_run or \
+                           playback_time_seconds >= autoplay_scheduler.song_end_seconds():
+                            playback_time_seconds = 0.0
+                        autoplay_scheduler.start(playback_time_seconds)
+                        autoplay_has_run = True
+                if pressed_key_code == pygame.K_HOME:
+                    playback_time_seconds = 0.0
+                    if autoplay_scheduler and autoplay_scheduler.is_playing():
+                        autoplay_scheduler.start(0.0)
                 if pressed_key_code in KEY_TO_MIDI_MAP and pressed_key_code not in pc_keys_held_down:
                     midi_note_to_play = KEY_TO_MIDI_MAP[pressed_key_code]
                     # Check if the MIDI note is within the displayable keyboard range
@@ -287,6 +352,8 @@ def main_application():
                     if min_midi_on_keyboard <= midi_note_to_play <= max_midi_on_keyboard:
                         if midi_note_to_play in white_keys_map or midi_note_to_play in black_keys_map:
                             currently_active_midis.add(midi_note_to_play)
+                            emit_key_sparks(spark_pool, midi_note_to_play, white_keys_map, black_keys_map,
+                                            ACTION_LINE_Y, SPARKS_PER_KEY_STRIKE, WHITE)
                             pc_keys_held_down.add(pressed_key_code)
                             if main_placeholder_sound: main_placeholder_sound.play()
 
@@ -312,8 +379,17 @@ def main_application():
                           white_keys_map, black_keys_map, NOTE_FALL_SPEED, ACTION_LINE_Y,
                           MAIN_VIEW_TOP_Y, piano_roll_view_area_bottom_y)
 
+        # Draw Sparks on top of the piano roll
+        emit_note_hit_sparks(spark_pool, sample_notes_sequence, previous_playback_time_seconds,
+                             playback_time_seconds, white_keys_map, black_keys_map, ACTION_LINE_Y)
+        spark_pool.update(time_step_seconds)
+        spark_pool.render(main_screen)
+
         # Draw Keyboard
-        render_keyboard(main_screen, white_keys_map, black_keys_map, currently_active_midis)
+        displayed_active_midis = currently_active_midis
+        if autoplay_scheduler and autoplay_scheduler.is_playing():
+            displayed_active_midis = currently_active_midis | autoplay_scheduler.sounding_midis()
+        render_keyboard(main_screen, white_keys_map, black_keys_map, displayed_active_midis)
 
         pygame.display.flip()
 
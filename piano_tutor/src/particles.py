@@ -0,0 +1,182 @@
+# piano_tutor/src/particles.py
+import numpy
+import pygame
+
+# --- Particle Constants ---
+DEFAULT_PARTICLE_CAPACITY = 4096
+SPARK_GRAVITY = 600.0        # Pixels per second squared, pulls sparks back down
+SPARK_SPEED_RANGE = (80.0, 320.0) # Pixels per second at emission
+SPARK_LIFE_RANGE = (0.25, 0.6)    # Seconds
+SPARK_SIZE = 2               # Sparks are drawn as SPARK_SIZE x SPARK_SIZE pixel squares
+
+
+class ParticlePool:
+    """
+    Fixed-capacity spark particles stored as parallel NumPy arrays.
+
+    All storage, including the scratch buffers used while emitting and drawing, is
+    allocated once in __init__. New sparks take dead slots first; only when the pool
+    is full are the sparks closest to dying recycled, so the pool never grows.
+    update() integrates every slot in place and render() writes all live sparks
+    to the target surface's pixels in a few array assignments.
+    """
+    def __init__(self, capacity=DEFAULT_PARTICLE_CAPACITY, gravity=SPARK_GRAVITY, seed=None):
+        """
+        Initializes a ParticlePool.
+
+        Args:
+            capacity (int): Maximum number of simultaneously live particles.
+            gravity (float): Downward acceleration in pixels per second squared.
+            seed (int | None): Seed for the emission randomness (for reproducible effects).
+        """
+        if not isinstance(capacity, int) or capacity <= 0:
+            raise ValueError("capacity must be a positive integer.")
+
+        self.capacity = capacity
+        self.gravity = gravity
+        self.positions = numpy.zeros((capacity, 2), dtype=numpy.float32)
+        self.velocities = numpy.zeros((capacity, 2), dtype=numpy.float32)
+        self.life = numpy.zeros(capacity, dtype=numpy.float32) # Seconds left; <= 0 means dead
+        self.max_life = numpy.ones(capacity, dtype=numpy.float32)
+        self.colors = numpy.zeros((capacity, 3), dtype=numpy.float32)
+
+        # Scratch buffers; per-call work uses [:n] slices of these. Compaction targets
+        # send unselected slots to a trash row at index capacity, hence the extra row.
+        self._slot_indices = numpy.arange(capacity, dtype=numpy.intp)
+        self._step_scratch = numpy.zeros((capacity, 2), dtype=numpy.float32)
+        self._alive_mask = numpy.zeros(capacity, dtype=bool)
+        self._bounds_mask = numpy.zeros(capacity, dtype=bool)
+        self._compact_targets = numpy.zeros(capacity, dtype=numpy.intp)
+        self._compacted_slots = numpy.zeros(capacity + 1, dtype=numpy.intp)
+        self._emit_angles = numpy.zeros(capacity, dtype=numpy.float32)
+        self._emit_speeds = numpy.zeros(capacity, dtype=numpy.float32)
+        self._emit_components = numpy.zeros(capacity, dtype=numpy.float32)
+        self._live_positions = numpy.zeros((capacity + 1, 2), dtype=numpy.float32)
+        self._live_life = numpy.zeros(capacity + 1, dtype=numpy.float32)
+        self._live_max_life = numpy.zeros(capacity + 1, dtype=numpy.float32)
+        self._live_colors = numpy.zeros((capacity + 1, 3), dtype=numpy.float32)
+        self._pixel_xs = numpy.zeros(capacity, dtype=numpy.intp)
+        self._pixel_ys = numpy.zeros(capacity, dtype=numpy.intp)
+        self._offset_xs = numpy.zeros(capacity, dtype=numpy.intp)
+        self._offset_ys = numpy.zeros(capacity, dtype=numpy.intp)
+        self._faded_colors = numpy.zeros((capacity, 3), dtype=numpy.float32)
+        self._pixel_colors = numpy.zeros((capacity, 3), dtype=numpy.uint8)
+        self._rng = numpy.random.default_rng(seed)
+
+    def _set_compact_targets(self, selected_mask):
+        """
+        Fills _compact_targets so that buffer[_compact_targets] = array packs the
+        selected slots of array, in order, into buffer[:n]. Returns n. Unlike
+        numpy.compress or boolean indexing, this allocates no temporary arrays.
+        """
+        targets = self._compact_targets
+        numpy.copyto(targets, selected_mask)
+        numpy.cumsum(targets, out=targets)
+        num_selected = int(targets[-1])
+        numpy.subtract(targets, 1, out=targets)
+        numpy.logical_not(selected_mask, out=selected_mask)
+        numpy.copyto(targets, self.capacity, where=selected_mask) # Unselected go to the trash row
+        numpy.logical_not(selected_mask, out=selected_mask)
+        return num_selected
+
+    def _uniform_into(self, buffer, low, high):
+        self._rng.random(out=buffer, dtype=numpy.float32)
+        numpy.multiply(buffer, high - low, out=buffer)
+        numpy.add(buffer, low, out=buffer)
+        return buffer
+
+    def emit(self, x, y, count, color, spread_rad=numpy.pi / 3):
+        """
+        Emits a burst of sparks travelling upwards from (x, y).
+
+        Args:
+            x (float): Horizontal emission point in pixels.
+            y (float): Vertical emission point in pixels.
+            count (int): Number of sparks; capped at the pool capacity.
+            color (tuple[int, int, int]): RGB color at full life; sparks fade to black.
+            spread_rad (float): Half-angle of the emission cone around straight up.
+        """
+        count = min(int(count), self.capacity)
+        if count <= 0:
+            return
+
+        numpy.less_equal(self.life, 0.0, out=self._bounds_mask)
+        num_dead = self._set_compact_targets(self._bounds_mask)
+        if num_dead >= count:
+            self._compacted_slots[self._compact_targets] = self._slot_indices
+            slots = self._compacted_slots[:count]
+        else:
+            # Pool is full: recycle the sparks with the least life left (dead ones included).
+            # This is the only path that allocates, and only while the pool is saturated.
+            slots = numpy.argpartition(self.life, count - 1)[:count]
+
+        angles = self._uniform_into(self._emit_angles[:count], -spread_rad - numpy.pi / 2, spread_rad - numpy.pi / 2)
+        speeds = self._uniform_into(self._emit_speeds[:count], SPARK_SPEED_RANGE[0], SPARK_SPEED_RANGE[1])
+        components = self._emit_components[:count]
+        self.positions[slots] = (x, y)
+        numpy.cos(angles, out=components)
+        numpy.multiply(components, speeds, out=components)
+        self.velocities[slots, 0] = components
+        numpy.sin(angles, out=components)
+        numpy.multiply(components, speeds, out=components)
+        self.velocities[slots, 1] = components
+        self.max_life[slots] = self._uniform_into(components, SPARK_LIFE_RANGE[0], SPARK_LIFE_RANGE[1])
+        self.life[slots] = components
+        self.colors[slots] = color
+
+    def update(self, dt_sec):
+        """Advances every particle by dt_sec seconds (semi-implicit Euler, in place)."""
+        self.velocities[:, 1] += self.gravity * dt_sec
+        numpy.multiply(self.velocities, dt_sec, out=self._step_scratch)
+        self.positions += self._step_scratch
+        self.life -= dt_sec
+
+    def live_count(self):
+        numpy.greater(self.life, 0.0, out=self._alive_mask)
+        return int(numpy.count_nonzero(self._alive_mask))
+
+    def render(self, surface):
+        """Draws all live particles onto surface (typically after render_piano_roll)."""
+        surface_width, surface_height = surface.get_size()
+        # Live and with the whole SPARK_SIZE square inside the surface
+        numpy.greater(self.life, 0.0, out=self._alive_mask)
+        for axis, axis_limit in ((0, surface_width - SPARK_SIZE), (1, surface_height - SPARK_SIZE)):
+            numpy.greater_equal(self.positions[:, axis], 0.0, out=self._bounds_mask)
+            numpy.logical_and(self._alive_mask, self._bounds_mask, out=self._alive_mask)
+            numpy.less(self.positions[:, axis], axis_limit, out=self._bounds_mask)
+            numpy.logical_and(self._alive_mask, self._bounds_mask, out=self._alive_mask)
+        num_live = self._set_compact_targets(self._alive_mask)
+        if num_live == 0:
+            return
+
+        # Compact the live sparks to the front of the scratch buffers
+        self._live_positions[self._compact_targets] = self.positions
+        self._live_life[self._compact_targets] = self.life
+        self._live_max_life[self._compact_targets] = self.max_life
+        self._live_colors[self._compact_targets] = self.colors
+        live_positions = self._live_positions[:num_live]
+        live_life = self._live_life[:num_live]
+        live_max_life = self._live_max_life[:num_live]
+        live_colors = self._live_colors[:num_live]
+
+        xs, ys = self._pixel_xs[:num_live], self._pixel_ys[:num_live]
+        numpy.copyto(xs, live_positions[:, 0], casting="unsafe")
+        numpy.copyto(ys, live_positions[:, 1], casting="unsafe")
+        numpy.divide(live_life, live_max_life, out=live_life) # Fade factor in (0, 1]
+        # Per channel rather than broadcasting live_life[:, None], which buffers internally
+        faded_colors = self._faded_colors[:num_live]
+        for channel in range(3):
+            numpy.multiply(live_colors[:, channel], live_life, out=faded_colors[:, channel])
+        spark_colors = self._pixel_colors[:num_live]
+        numpy.copyto(spark_colors, faded_colors, casting="unsafe")
+
+        offset_xs, offset_ys = self._offset_xs[:num_live], self._offset_ys[:num_live]
+        surface_pixels = pygame.surfarray.pixels3d(surface)
+        try:
+            for dx in range(SPARK_SIZE):
+                numpy.add(xs, dx, out=offset_xs)
+                for dy in range(SPARK_SIZE):
+                    numpy.add(ys, dy, out=offset_ys)
+                    surface_pixels[offset_xs, offset_ys] = spark_colors
+        finally:
+            del surface_pixels # Unlocks the surface
@@ -0,0 +1,333 @@
+# piano_tutor/src/transcriber.py
+import math
+import multiprocessing
+import sys
+import wave
+import numpy
+from note import Note # Assuming note.py is in the same directory (src/)
+
+# --- Transcription Constants ---
+DEFAULT_FRAME_SIZE = 4096     # STFT window length in samples
+DEFAULT_HOP_SIZE = 512        # Samples between successive STFT frames
+DEFAULT_CHUNK_FRAMES = 1024   # STFT frames analysed per chunk (bounds memory per read)
+HPS_HARMONICS = 3             # Harmonics summed per candidate pitch, favours the fundamental
+SILENCE_RMS_THRESHOLD = 0.01  # Frames quieter than this (fraction of full scale) are rests
+MIN_NOTE_FRAMES = 6           # Shorter pitch runs are treated as detection glitches
+ONSET_FLUX_RATIO = 0.15       # Spectral flux (relative to the recent level) that marks a new attack
+ONSET_MIN_LEVEL_RATIO = 0.9   # Newest hop RMS vs the previous hop's; lower means a release, not an attack
+ONSET_CONTEXT_FRAMES = 3      # Frames read before each chunk so its first onsets can be judged
+LOWEST_MIDI, HIGHEST_MIDI = 21, 108 # A0 to C8, the range of a full piano
+NO_PITCH = -1
+
+
+def _read_samples(wav_file, start_sample, num_samples):
+    """Reads num_samples mono float samples in [-1, 1) starting at start_sample."""
+    wav_file.setpos(start_sample)
+    raw_bytes = wav_file.readframes(num_samples)
+    sample_width = wav_file.getsampwidth()
+    if sample_width == 1:
+        samples = (numpy.frombuffer(raw_bytes, dtype=numpy.uint8).astype(numpy.float32) - 128) / 128.0
+    elif sample_width == 2:
+        samples = numpy.frombuffer(raw_bytes, dtype="<i2").astype(numpy.float32) / 32768.0
+    elif sample_width == 3:
+        # No 24-bit dtype: place each little-endian sample in the top three bytes of an int32
+        padded_bytes = numpy.zeros((len(raw_bytes) // 3, 4), dtype=numpy.uint8)
+        padded_bytes[:, 1:] = numpy.frombuffer(raw_bytes, dtype=numpy.uint8).reshape(-1, 3)
+        samples = padded_bytes.view("<i4")[:, 0].astype(numpy.float32) / 2147483648.0
+    elif sample_width == 4:
+        samples = numpy.frombuffer(raw_bytes, dtype="<i4").astype(numpy.float32) / 2147483648.0
+    else:
+        raise ValueError(f"Unsupported WAV sample width: {sample_width} bytes.")
+
+    num_channels = wav_file.getnchannels()
+    if num_channels > 1: # Downmix so stereo recordings still work
+        samples = samples[:len(samples) - len(samples) % num_channels]
+        samples = samples.reshape(-1, num_channels).mean(axis=1)
+    return samples
+
+
+def _read_chunk_samples(wav_file, first_frame, num_frames, frame_size, hop_size):
+    """
+    Reads the samples covering num_frames STFT frames from first_frame onwards, preceded
+    by ONSET_CONTEXT_FRAMES frames of context (zeros before the start of the file).
+    """
+    context_start = first_frame - ONSET_CONTEXT_FRAMES
+    leading_zeros = max(0, -context_start) * hop_size
+    num_samples = (num_frames + ONSET_CONTEXT_FRAMES - 1) * hop_size + frame_size
+    samples = _read_samples(wav_file, max(0, context_start) * hop_size, num_samples - leading_zeros)
+    return numpy.pad(samples, (leading_zeros, 0)) if leading_zeros else samples
+
+
+def _detect_frame_pitches(samples, sample_rate, num_frames, frame_size, hop_size):
+    """
+    Analyses num_frames STFT frames of samples, which must start with
+    ONSET_CONTEXT_FRAMES frames of context (see _read_chunk_samples).
+
+    All frames of the chunk are windowed, transformed and peak-picked together. The
+    tail of the recording is zero-padded so the last frames still fit.
+
+    Returns:
+        tuple[numpy.ndarray, numpy.ndarray]: One MIDI number per frame (NO_PITCH for
+                                             rests), and a boolean per frame that is True
+                                             where a new attack enters the frame.
+    """
+    num_frames_with_context = num_frames + ONSET_CONTEXT_FRAMES
+    needed_samples = (num_frames_with_context - 1) * hop_size + frame_size
+    if len(samples) < needed_samples:
+        samples = numpy.pad(samples, (0, needed_samples - len(samples)))
+    frames = numpy.lib.stride_tricks.sliding_window_view(samples, frame_size)[::hop_size][:num_frames_with_context]
+
+    # Loudness around the frame centre (where notes are timed), so a rest shorter than
+    # the window still shows up
+    centre_samples = frames[:, (frame_size - hop_size) // 2:(frame_size + hop_size) // 2]
+    centre_rms = numpy.sqrt(numpy.mean(centre_samples * centre_samples, axis=1))
+    magnitudes = numpy.abs(numpy.fft.rfft(frames * numpy.hanning(frame_size).astype(numpy.float32), axis=1))
+
+    # Harmonic summation: each candidate fundamental scores its own level plus its
+    # harmonics, each harmonic capped at the fundamental's level. The cap stops a
+    # sub-harmonic (an empty bin below a strong partial) from borrowing that
+    # partial's energy, while real harmonics still favour the true fundamental.
+    hps_length = magnitudes.shape[1] // HPS_HARMONICS
+    log_magnitudes = numpy.log(magnitudes + 1e-9)
+    frame_peaks = magnitudes.max(axis=1, keepdims=True)
+    levels = numpy.log1p(magnitudes / (frame_peaks * 1e-3 + 1e-9))
+    hps = levels[:, :hps_length].copy()
+    for harmonic in range(2, HPS_HARMONICS + 1):
+        hps += numpy.minimum(levels[:, ::harmonic][:, :hps_length], levels[:, :hps_length])
+
+    bin_hz = sample_rate / frame_size
+    lowest_bin = max(1, int(440.0 * 2 ** ((LOWEST_MIDI - 69) / 12.0) / bin_hz))
+    peak_bins = numpy.argmax(hps[:, lowest_bin:-1], axis=1) + lowest_bin
+
+    # Parabolic interpolation around the peak for sub-bin frequency accuracy
+    frame_indices = numpy.arange(len(frames))
+    alpha = log_magnitudes[frame_indices, peak_bins - 1]
+    beta = log_magnitudes[frame_indices, peak_bins]
+    gamma = log_magnitudes[frame_indices, peak_bins + 1]
+    denominator = alpha - 2 * beta + gamma
+    safe_denominator = numpy.where(denominator == 0, 1.0, denominator)
+    offsets = numpy.where(denominator == 0, 0.0, 0.5 * (alpha - gamma) / safe_denominator)
+    frequencies = (peak_bins + numpy.clip(offsets, -0.5, 0.5)) * bin_hz
+
+    midi_numbers = numpy.rint(69 + 12 * numpy.log2(frequencies / 440.0)).astype(numpy.int32)
+    is_rest = (centre_rms < SILENCE_RMS_THRESHOLD) | (midi_numbers < LOWEST_MIDI) | (midi_numbers > HIGHEST_MIDI)
+    midi_numbers[is_rest] = NO_PITCH
+
+    # Spectral flux: how much new energy appeared since the previous frame. A re-struck
+    # key shows up here even when the pitch and overall level stay the same. The flux is
+    # measured against the louder of the two previous frames, so frames that go quiet do
+    # not inflate it.
+    compressed = numpy.log1p(100.0 * magnitudes)
+    flux = numpy.maximum(compressed[2:] - compressed[1:-1], 0.0).sum(axis=1)
+    frame_levels = compressed.sum(axis=1)
+    above_threshold = flux > ONSET_FLUX_RATIO * numpy.maximum(frame_levels[1:-1], frame_levels[:-2]) + 1e-9
+    # Only the first frame of each burst of high flux counts as the onset
+    onsets = numpy.zeros(num_frames_with_context, dtype=bool)
+    onsets[3:] = above_threshold[1:] & ~above_threshold[:-1]
+    # A release smears the spectrum just as an attack does, but the hop entering the
+    # window gets quieter instead of louder
+    leading_hop_rms = numpy.sqrt(numpy.mean(frames[:, -hop_size:] ** 2, axis=1))
+    onsets[1:] &= leading_hop_rms[1:] >= ONSET_MIN_LEVEL_RATIO * leading_hop_rms[:-1]
+    onsets &= ~is_rest
+    return midi_numbers[ONSET_CONTEXT_FRAMES:], onsets[ONSET_CONTEXT_FRAMES:]
+
+
+def _detect_chunk_pitches(chunk_spec):
+    """
+    Worker entry point: opens the WAV itself and analyses one chunk of frames.
+
+    Args:
+        chunk_spec (tuple): (wav_path, first_frame, num_frames, frame_size, hop_size).
+    """
+    wav_path, first_frame, num_frames, frame_size, hop_size = chunk_spec
+    with wave.open(wav_path, "rb") as wav_file:
+        samples = _read_chunk_samples(wav_file, first_frame, num_frames, frame_size, hop_size)
+        return _detect_frame_pitches(samples, wav_file.getframerate(), num_frames, frame_size, hop_size)
+
+
+class _NoteSegmenter:
+    """
+    Turns a stream of per-frame MIDI numbers and onsets into Note objects, one chunk
+    at a time. A note ends when the pitch changes, or when the same key is struck again.
+
+    A new pitch (or a rest) only takes over once it has lasted MIN_NOTE_FRAMES, so brief
+    detection glitches, such as the smeared spectrum right at a re-strike, do not cut
+    the surrounding note in two. Likewise, a re-strike only splits the note once the
+    pitch has held for MIN_NOTE_FRAMES after it; an onset followed sooner by a pitch
+    change or a rest belonged to that change.
+    """
+    def __init__(self, sample_rate, frame_size, hop_size):
+        self.frame_sec = hop_size / sample_rate
+        self.centre_offset_sec = (frame_size / 2) / sample_rate
+        # Onsets are flagged once an attack is about a frame into the (tapered) leading edge
+        # of the window; the frame centred on the attack, which is how notes are timed,
+        # comes this many frames later.
+        self.onset_delay_frames = max(0, frame_size // (2 * hop_size) - 1)
+        self.notes = []
+        self._frames_seen = 0
+        self._raw_midi = NO_PITCH # Pitch of the last frame fed, to find changes across chunks
+        self._note_midi = NO_PITCH
+        self._note_start_frame = 0
+        self._candidate = None # (midi, start_frame) of a pitch change not yet confirmed
+        self._candidate_onset_frame = None # Onset seen while the candidate was pending
+        self._rest_start_frame = None # Where the note went quiet, if a pending change began with a rest
+        self._pending_split_frame = None # Re-strike waiting to be confirmed by the pitch holding
+        self._pending_onsets = [] # Absolute frame indices not yet reached
+
+    def _close_note(self, end_frame):
+        note_length = end_frame - self._note_start_frame
+        if self._note_midi != NO_PITCH and note_length >= MIN_NOTE_FRAMES:
+            start_time = max(0.0, self._note_start_frame * self.frame_sec + self.centre_offset_sec - self.frame_sec / 2)
+            self.notes.append(Note(int(self._note_midi), start_time, note_length * self.frame_sec))
+
+    def _split_note(self, onset_frame):
+        # Same key struck again: the split is only made once the pitch has held after it
+        if (self._note_midi != NO_PITCH and self._pending_split_frame is None
+                and onset_frame - self._note_start_frame >= MIN_NOTE_FRAMES):
+            self._pending_split_frame = onset_frame
+
+    def _apply_pending_split(self, current_frame):
+        split_frame = self._pending_split_frame
+        if split_frame is None or current_frame - split_frame < MIN_NOTE_FRAMES:
+            return
+        if self._candidate is not None and self._candidate[1] - split_frame < MIN_NOTE_FRAMES:
+            return # Decided by whether that change is confirmed
+        self._close_note(split_frame)
+        self._note_start_frame = split_frame
+        self._pending_split_frame = None
+
+    def _candidate_bounds(self):
+        """Returns (end of the current note, start of the candidate) if the candidate takes over."""
+        candidate_midi, candidate_start_frame = self._candidate
+        if self._rest_start_frame is not None:
+            return self._rest_start_frame, candidate_start_frame
+        attack_frame = self._pending_split_frame
+        if attack_frame is None:
+            attack_frame = self._candidate_onset_frame
+        if attack_frame is not None and candidate_midi != NO_PITCH:
+            # The onset was the new pitch's attack, which is picked up before the pitch settles
+            return attack_frame, attack_frame
+        return candidate_start_frame, candidate_start_frame
+
+    def _confirm_candidate(self, current_frame):
+        self._apply_pending_split(current_frame)
+        if self._candidate is not None and current_frame - self._candidate[1] >= MIN_NOTE_FRAMES:
+            note_end_frame, candidate_start_frame = self._candidate_bounds()
+            self._close_note(note_end_frame)
+            self._note_midi, self._note_start_frame = self._candidate[0], candidate_start_frame
+            self._candidate = None
+            self._candidate_onset_frame = None
+            self._rest_start_frame = None
+            self._pending_split_frame = None
+
+    def feed(self, frame_midis, frame_onsets):
+        # Only the frames where the pitch changes or an onset lands need Python-level work
+        chunk_end_frame = self._frames_seen + len(frame_midis)
+        self._pending_onsets.extend(
+            (numpy.flatnonzero(frame_onsets) + self._frames_seen + self.onset_delay_frames).tolist()
+        )
+        change_points = (numpy.flatnonzero(numpy.diff(frame_midis, prepend=self._raw_midi)) + self._frames_seen).tolist()
+        onsets_in_chunk = [frame for frame in self._pending_onsets if frame < chunk_end_frame]
+        self._pending_onsets = [frame for frame in self._pending_onsets if frame >= chunk_end_frame]
+
+        for event_frame, is_pitch_change in sorted([(frame, True) for frame in change_points] +
+                                                   [(frame, False) for frame in onsets_in_chunk]):
+            self._confirm_candidate(event_frame)
+            if is_pitch_change:
+                new_midi = int(frame_midis[event_frame - self._frames_seen])
+                if new_midi == self._note_midi:
+                    # Back to the note's pitch before the change was confirmed: it was a glitch,
+                    # unless the note went quiet in between, which means it was struck again
+                    if self._rest_start_frame is not None:
+                        self._close_note(self._rest_start_frame)
+                        self._note_start_frame = event_frame
+                        self._pending_split_frame = None
+                    elif self._candidate_onset_frame is not None:
+                        self._split_note(self._candidate_onset_frame)
+                    self._candidate = None
+                    self._candidate_onset_frame = None
+                    self._rest_start_frame = None
+                else:
+                    if new_midi == NO_PITCH and self._rest_start_frame is None:
+                        self._rest_start_frame = event_frame
+                    self._candidate = (new_midi, event_frame)
+            elif self._candidate is not None:
+                if self._candidate_onset_frame is None:
+                    self._candidate_onset_frame = event_frame
+            else:
+                self._split_note(event_frame)
+
+        self._confirm_candidate(chunk_end_frame)
+        self._raw_midi = int(frame_midis[-1])
+        self._frames_seen = chunk_end_frame
+
+    def finish(self):
+        self._confirm_candidate(self._frames_seen)
+        self._close_note(self._candidate_bounds()[0] if self._candidate is not None else self._frames_seen)
+        self._note_midi = NO_PITCH
+        self._candidate = None
+        self._rest_start_frame = None
+        self._pending_split_frame = None # Too close to the end to be confirmed
+        return self.notes
+
+
+def transcribe_wav(wav_path, frame_size=DEFAULT_FRAME_SIZE, hop_size=DEFAULT_HOP_SIZE,
+                   chunk_frames=DEFAULT_CHUNK_FRAMES, num_workers=1):
+    """
+    Transcribes a (mono) WAV recording into a list of Note objects.
+
+    The file is read in chunks of chunk_frames STFT frames, so memory use depends on the
+    chunk size rather than the length of the recording. Pitch detection is monophonic:
+    one note per frame, chosen by harmonic summation. Repeated strikes of the
+    same key are split apart by spectral-flux onset detection.
+
+    Args:
+        wav_path (str): Path to the WAV file. Multi-channel files are downmixed.
+        frame_size (int): STFT window length in samples. Larger windows resolve lower notes.
+        hop_size (int): Samples between frames; sets the timing resolution of the notes.
+        chunk_frames (int): Number of frames analysed per chunk.
+        num_workers (int): Processes to split the chunks across (1 = analyse in this process).
+
+    Returns:
+        list[Note]: Detected notes ordered by start time.
+    """
+    if frame_size <= 0 or hop_size <= 0 or chunk_frames <= 0:
+        raise ValueError("frame_size, hop_size and chunk_frames must be positive.")
+
+    with wave.open(wav_path, "rb") as wav_file:
+        sample_rate = wav_file.getframerate()
+        total_samples = wav_file.getnframes()
+        segmenter = _NoteSegmenter(sample_rate, frame_size, hop_size)
+        if total_samples == 0:
+            return segmenter.finish()
+
+        total_frames = max(1, math.ceil((total_samples - frame_size) / hop_size) + 1)
+        chunk_specs = [
+            (wav_path, first_frame, min(chunk_frames, total_frames - first_frame), frame_size, hop_size)
+            for first_frame in range(0, total_frames, chunk_frames)
+        ]
+
+        if num_workers > 1:
+            with multiprocessing.Pool(num_workers) as worker_pool:
+                # imap keeps chunk order, so the segmenter still sees frames in sequence
+                for frame_midis, frame_onsets in worker_pool.imap(_detect_chunk_pitches, chunk_specs):
+                    segmenter.feed(frame_midis, frame_onsets)
+        else:
+            for _, first_frame, num_frames, _, _ in chunk_specs:
+                samples = _read_chunk_samples(wav_file, first_frame, num_frames, frame_size, hop_size)
+                segmenter.feed(*_detect_frame_pitches(samples, sample_rate, num_frames, frame_size, hop_size))
+
+    return segmenter.finish()
+
+
+# Example usage: python transcriber.py recording.wav [num_workers]
+if __name__ == '__main__':
+    if len(sys.argv) < 2:
+        print("Usage: python transcriber.py <recording.wav> [num_workers]")
+        sys.exit(1)
+    try:
+        workers = int(sys.argv[2]) if len(sys.argv) > 2 else 1
+        for transcribed_note in transcribe_wav(sys.argv[1], num_workers=workers):
+            print(transcribed_note)
+    except (OSError, wave.Error, ValueError) as e:
+        print(f"Error transcribing {sys.argv[1]}: {e}")
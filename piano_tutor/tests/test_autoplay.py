@@ -0,0 +1,116 @@
+# piano_tutor/tests/test_autoplay.py
+import os
+import sys
+import time
+import numpy
+import pytest
+
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+import pygame # noqa: E402
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+from autoplay import AutoplayScheduler # noqa: E402
+from note import Note # noqa: E402
+
+SAMPLE_RATE = 44100
+BLOCK_SEC = 0.05
+
+
+@pytest.fixture
+def mixer_channel():
+    pygame.mixer.init(frequency=SAMPLE_RATE, size=-16, channels=1, buffer=512)
+    pygame.mixer.set_reserved(1)
+    yield pygame.mixer.Channel(0)
+    pygame.mixer.quit()
+
+
+def sound_samples(sound):
+    return numpy.frombuffer(sound.get_raw(), dtype=numpy.int16)
+
+
+def mix_blocks(scheduler, num_blocks):
+    return numpy.concatenate([sound_samples(scheduler._mix_next_block()[1]) for _ in range(num_blocks)])
+
+
+def expected_mix(scheduler, notes_list, num_samples, first_sample=0):
+    """Reference mix: every note's tone placed at its rounded start sample."""
+    expected = numpy.zeros(num_samples + first_sample, dtype=numpy.float32)
+    for music_note_obj in notes_list:
+        note_start_sample = int(round(music_note_obj.start_time * SAMPLE_RATE))
+        tone = scheduler._tone_for(music_note_obj.note_midi, int(round(music_note_obj.duration * SAMPLE_RATE)))
+        note_end_sample = min(note_start_sample + len(tone), len(expected))
+        expected[note_start_sample:note_end_sample] += tone[:note_end_sample - note_start_sample]
+    return (numpy.clip(expected[first_sample:], -1.0, 1.0) * 32767).astype(numpy.int16)
+
+
+def test_notes_land_at_exact_sample_offsets_across_blocks(mixer_channel):
+    block_samples = int(round(BLOCK_SEC * SAMPLE_RATE))
+    # Second note starts a few samples before a block boundary and runs across two more
+    song_notes = [
+        Note(60, 0.01, 0.02),
+        Note(67, (block_samples - 3) / SAMPLE_RATE, 0.12),
+    ]
+    scheduler = AutoplayScheduler(song_notes, mixer_channel, sample_rate=SAMPLE_RATE, block_sec=BLOCK_SEC)
+    mixed = mix_blocks(scheduler, 5)
+    numpy.testing.assert_array_equal(mixed, expected_mix(scheduler, song_notes, len(mixed)))
+    # The second tone's attack ramp starts at zero, so its first audible sample is one later
+    assert numpy.flatnonzero(mixed[int(0.04 * SAMPLE_RATE):])[0] + int(0.04 * SAMPLE_RATE) == block_samples - 2
+
+
+def test_chord_notes_sum(mixer_channel):
+    chord_notes = [Note(60, 0.02, 0.1), Note(64, 0.02, 0.1), Note(67, 0.02, 0.1)]
+    scheduler = AutoplayScheduler(chord_notes, mixer_channel, sample_rate=SAMPLE_RATE, block_sec=BLOCK_SEC)
+    mixed = mix_blocks(scheduler, 3)
+    numpy.testing.assert_array_equal(mixed, expected_mix(scheduler, chord_notes, len(mixed)))
+    single = AutoplayScheduler(chord_notes[:1], mixer_channel, sample_rate=SAMPLE_RATE, block_sec=BLOCK_SEC)
+    assert numpy.abs(mixed).max() > numpy.abs(mix_blocks(single, 3)).max()
+
+
+def test_start_joins_a_note_mid_way(mixer_channel):
+    song_notes = [Note(60, 0.1, 0.4), Note(64, 0.6, 0.2)]
+    scheduler = AutoplayScheduler(song_notes, mixer_channel, sample_rate=SAMPLE_RATE, block_sec=BLOCK_SEC)
+    scheduler.start(0.3)
+    try:
+        first_block = sound_samples(scheduler._playing_sound)
+        start_sample = int(round(0.3 * SAMPLE_RATE))
+        numpy.testing.assert_array_equal(
+            first_block, expected_mix(scheduler, song_notes, len(first_block), first_sample=start_sample)
+        )
+        assert numpy.abs(first_block).max() > 0
+        assert scheduler.playhead_seconds() >= 0.3
+    finally:
+        scheduler.stop()
+
+
+def test_stops_once_the_song_has_played_out(mixer_channel):
+    song_notes = [Note(60, 0.0, 0.1), Note(64, 0.1, 0.1)]
+    scheduler = AutoplayScheduler(song_notes, mixer_channel, sample_rate=SAMPLE_RATE, block_sec=BLOCK_SEC)
+    scheduler.start(0.0)
+    deadline = time.perf_counter() + 3.0
+    while scheduler.is_playing() and time.perf_counter() < deadline:
+        scheduler.update()
+        time.sleep(0.005)
+    assert not scheduler.is_playing()
+    assert scheduler.playhead_seconds() >= scheduler.song_end_seconds()
+    stopped_at = scheduler.playhead_seconds()
+    time.sleep(0.02)
+    assert scheduler.playhead_seconds() == stopped_at
+
+
+# pygame.mixer.init takes 32 for float output but get_init() reports it as -32
+@pytest.mark.parametrize("init_size, sample_dtype", [(8, numpy.uint8), (32, numpy.float32)])
+def test_blocks_use_the_mixer_sample_format(init_size, sample_dtype):
+    pygame.mixer.init(frequency=SAMPLE_RATE, size=init_size, channels=1)
+    try:
+        scheduler = AutoplayScheduler([Note(60, 0.0, 0.05)], pygame.mixer.Channel(0), sample_rate=SAMPLE_RATE,
+                                      block_sec=BLOCK_SEC, sample_size=pygame.mixer.get_init()[1])
+        block_sound = scheduler._mix_next_block()[1]
+        assert block_sound.get_length() == pytest.approx(BLOCK_SEC, abs=1e-3)
+        assert len(block_sound.get_raw()) == scheduler.block_samples * numpy.dtype(sample_dtype).itemsize
+    finally:
+        pygame.mixer.quit()
+
+
+def test_rejects_unknown_sample_size(mixer_channel):
+    with pytest.raises(ValueError):
+        AutoplayScheduler([], mixer_channel, sample_size=24)
@@ -0,0 +1,79 @@
+# piano_tutor/tests/test_particles.py
+import os
+import sys
+import numpy
+import pygame
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+from particles import SPARK_SIZE, ParticlePool # noqa: E402
+
+SPARK_COLOR = (200, 100, 50)
+
+
+def test_emit_reuses_dead_slots_before_live_ones():
+    particle_pool = ParticlePool(capacity=8, seed=0)
+    particle_pool.emit(10.0, 20.0, 4, SPARK_COLOR)
+    particle_pool.life[[1, 2]] = 0.0 # Slots 1 and 2 have died
+    live_positions = particle_pool.positions[[0, 3]].copy()
+    live_life = particle_pool.life[[0, 3]].copy()
+
+    particle_pool.emit(50.0, 60.0, 3, (255, 255, 255))
+
+    # Dead slots are taken in slot order; live sparks are left untouched
+    numpy.testing.assert_array_equal(particle_pool.positions[[1, 2, 4]], [[50.0, 60.0]] * 3)
+    numpy.testing.assert_array_equal(particle_pool.positions[[0, 3]], live_positions)
+    numpy.testing.assert_array_equal(particle_pool.life[[0, 3]], live_life)
+    numpy.testing.assert_array_equal(particle_pool.colors[[0, 3]], [SPARK_COLOR] * 2)
+    assert particle_pool.live_count() == 5
+
+
+def test_full_pool_recycles_the_sparks_closest_to_dying():
+    particle_pool = ParticlePool(capacity=4, seed=0)
+    particle_pool.emit(10.0, 20.0, 4, SPARK_COLOR)
+    particle_pool.life[:] = [0.5, 0.1, 0.4, 0.2]
+
+    particle_pool.emit(50.0, 60.0, 2, (255, 255, 255))
+
+    numpy.testing.assert_array_equal(particle_pool.positions[[1, 3]], [[50.0, 60.0]] * 2)
+    numpy.testing.assert_array_equal(particle_pool.positions[[0, 2]], [[10.0, 20.0]] * 2)
+    numpy.testing.assert_array_equal(particle_pool.life[[0, 2]], numpy.float32([0.5, 0.4]))
+    assert particle_pool.live_count() == 4
+
+
+def test_update_integrates_velocity_gravity_and_life():
+    particle_pool = ParticlePool(capacity=2, gravity=100.0)
+    particle_pool.positions[:] = [[10.0, 20.0], [30.0, 40.0]]
+    particle_pool.velocities[:] = [[5.0, -50.0], [-10.0, 0.0]]
+    particle_pool.life[:] = [0.5, 0.05]
+
+    particle_pool.update(0.1)
+
+    # Semi-implicit Euler: gravity updates the velocity before it moves the spark
+    numpy.testing.assert_allclose(particle_pool.velocities, [[5.0, -40.0], [-10.0, 10.0]])
+    numpy.testing.assert_allclose(particle_pool.positions, [[10.5, 16.0], [29.0, 41.0]])
+    numpy.testing.assert_allclose(particle_pool.life, [0.4, -0.05], atol=1e-6)
+    assert particle_pool.live_count() == 1
+
+
+def test_render_draws_only_live_in_bounds_sparks_faded_by_life():
+    surface = pygame.Surface((20, 20), depth=32)
+    surface.fill((0, 0, 0))
+    particle_pool = ParticlePool(capacity=4)
+    particle_pool.positions[:] = [[5.7, 6.2], [10.0, 10.0], [19.0, 5.0], [-1.0, 3.0]]
+    particle_pool.colors[:] = SPARK_COLOR
+    particle_pool.max_life[:] = 1.0
+    particle_pool.life[:] = [0.5, 0.0, 1.0, 1.0] # Slot 1 is dead; slots 2 and 3 are off the surface
+
+    particle_pool.render(surface)
+
+    surface_pixels = pygame.surfarray.array3d(surface)
+    lit_pixels = set(zip(*numpy.nonzero(surface_pixels.any(axis=2))))
+    assert lit_pixels == {(5 + dx, 6 + dy) for dx in range(SPARK_SIZE) for dy in range(SPARK_SIZE)}
+    for x, y in lit_pixels:
+        assert tuple(surface_pixels[x, y]) == (100, 50, 25) # Half its life left, half its color
+
+
+def test_rejects_non_positive_capacity():
+    with pytest.raises(ValueError):
+        ParticlePool(capacity=0)
@@ -0,0 +1,119 @@
+# piano_tutor/tests/test_transcriber.py
+import os
+import sys
+import wave
+import numpy
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+from transcriber import NO_PITCH, _NoteSegmenter, transcribe_wav # noqa: E402
+
+SAMPLE_RATE = 44100
+TIME_TOLERANCE_SEC = 0.03
+
+# (midi numbers, start time, duration): repeated strikes of one key and a C major chord
+REFERENCE_PERFORMANCE = [
+    ((64,), 0.8, 0.4), ((64,), 1.2, 0.4),
+    ((60,), 1.6, 0.3), ((60,), 1.9, 0.3),
+    ((60, 64, 67), 2.4, 0.6),
+    ((67,), 3.2, 0.25), ((67,), 3.45, 0.25), ((67,), 3.7, 0.5),
+]
+
+# Different pitches separated by short gaps of silence (50 to 100 ms)
+GAPPED_PERFORMANCE = [
+    ((60,), 0.5, 0.3), ((64,), 0.85, 0.3), ((67,), 1.225, 0.3), ((72,), 1.625, 0.3),
+    ((67,), 1.975, 0.3), ((64,), 2.35, 0.3), ((60,), 2.75, 0.3),
+]
+
+
+def write_performance_wav(filepath, events, decaying, release_sec=0.0, sample_width=2):
+    total_sec = max(start + dur for _, start, dur in events) + 0.5
+    buffer_data = numpy.zeros(int(total_sec * SAMPLE_RATE), dtype=numpy.float32)
+    for midi_numbers, start_time, duration in events:
+        t_vals = numpy.arange(int(duration * SAMPLE_RATE)) / SAMPLE_RATE
+        envelope = numpy.exp(-3 * t_vals) if decaying else numpy.ones_like(t_vals)
+        release_samples = min(int(release_sec * SAMPLE_RATE), len(t_vals))
+        if release_samples > 0: # Linear fade out over the last release_sec of the note
+            envelope[-release_samples:] *= numpy.linspace(1.0, 0.0, release_samples)
+        start_sample = int(start_time * SAMPLE_RATE)
+        for note_midi in midi_numbers:
+            frequency = 440.0 * 2 ** ((note_midi - 69) / 12.0)
+            buffer_data[start_sample:start_sample + len(t_vals)] += \
+                0.25 * envelope * numpy.sin(2 * numpy.pi * frequency * t_vals)
+    full_scale = 2 ** (8 * sample_width - 1) - 1
+    pcm_samples = (numpy.clip(buffer_data, -1, 1) * full_scale).astype("<i4")
+    if sample_width == 3: # Keep the low three bytes of each little-endian int32
+        pcm_bytes = pcm_samples.view(numpy.uint8).reshape(-1, 4)[:, :3].tobytes()
+    else:
+        pcm_bytes = pcm_samples.astype(f"<i{sample_width}").tobytes()
+    with wave.open(str(filepath), "w") as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(sample_width)
+        wf.setframerate(SAMPLE_RATE)
+        wf.writeframes(pcm_bytes)
+
+
+def assert_matches_performance(transcribed_notes, events):
+    assert len(transcribed_notes) == len(events)
+    for transcribed_note, (midi_numbers, start_time, duration) in zip(transcribed_notes, events):
+        # Transcription is monophonic, so a chord comes back as one of its pitches
+        assert transcribed_note.note_midi in midi_numbers
+        assert transcribed_note.start_time == pytest.approx(start_time, abs=TIME_TOLERANCE_SEC)
+        assert transcribed_note.duration == pytest.approx(duration, abs=TIME_TOLERANCE_SEC)
+
+
+@pytest.mark.parametrize("decaying", [False, True])
+@pytest.mark.parametrize("chunk_frames", [1024, 7])
+def test_round_trip_splits_repeated_notes(tmp_path, decaying, chunk_frames):
+    wav_path = tmp_path / "performance.wav"
+    write_performance_wav(wav_path, REFERENCE_PERFORMANCE, decaying)
+    assert_matches_performance(transcribe_wav(str(wav_path), chunk_frames=chunk_frames), REFERENCE_PERFORMANCE)
+
+
+def test_worker_pool_matches_single_process(tmp_path):
+    wav_path = tmp_path / "performance.wav"
+    write_performance_wav(wav_path, REFERENCE_PERFORMANCE, decaying=True)
+    single_process = transcribe_wav(str(wav_path), chunk_frames=50)
+    worker_pool = transcribe_wav(str(wav_path), chunk_frames=50, num_workers=2)
+    assert [repr(n) for n in worker_pool] == [repr(n) for n in single_process]
+
+
+@pytest.mark.parametrize("decaying", [False, True])
+def test_release_ramp_does_not_start_a_new_note(tmp_path, decaying):
+    wav_path = tmp_path / "release.wav"
+    single_note = [((60,), 0.5, 0.4)]
+    write_performance_wav(wav_path, single_note, decaying, release_sec=0.05)
+    assert_matches_performance(transcribe_wav(str(wav_path)), single_note)
+
+
+@pytest.mark.parametrize("decaying", [False, True])
+def test_short_gaps_between_different_pitches(tmp_path, decaying):
+    wav_path = tmp_path / "gapped.wav"
+    write_performance_wav(wav_path, GAPPED_PERFORMANCE, decaying, release_sec=0.03)
+    assert_matches_performance(transcribe_wav(str(wav_path)), GAPPED_PERFORMANCE)
+
+
+def test_reads_24_bit_pcm(tmp_path):
+    wav_path = tmp_path / "performance_24bit.wav"
+    write_performance_wav(wav_path, REFERENCE_PERFORMANCE, decaying=True, sample_width=3)
+    assert_matches_performance(transcribe_wav(str(wav_path)), REFERENCE_PERFORMANCE)
+
+
+# Expected notes are (midi number, start frame, length in frames); the onset lands at frame 18
+@pytest.mark.parametrize("next_midi, expected_notes", [
+    (60, [(60, 0, 18), (60, 18, 22)]),  # Pitch holds after the onset: the key was struck again
+    (64, [(60, 0, 18), (64, 18, 22)]),  # Pitch changes within MIN_NOTE_FRAMES: the onset was its attack
+    (NO_PITCH, [(60, 0, 20)]),          # Rest within MIN_NOTE_FRAMES: the onset came with the release
+])
+def test_onset_only_splits_when_the_pitch_holds(next_midi, expected_notes):
+    segmenter = _NoteSegmenter(SAMPLE_RATE, 4096, 512)
+    frame_midis = numpy.array([60] * 20 + [next_midi] * 20, dtype=numpy.int32)
+    frame_onsets = numpy.zeros(len(frame_midis), dtype=bool)
+    frame_onsets[18 - segmenter.onset_delay_frames] = True
+    segmenter.feed(frame_midis, frame_onsets)
+
+    first_frame_sec = segmenter.centre_offset_sec - segmenter.frame_sec / 2
+    assert [
+        (n.note_midi, round((n.start_time - first_frame_sec) / segmenter.frame_sec), round(n.duration / segmenter.frame_sec))
+        for n in segmenter.finish()
+    ] == expected_notes